@@ -12,10 +12,21 @@ player, whose AI is contained in the file "connect4player.py". This will have a
 class called ComputerPlayer, that has two public methods. The __init__() method
 will take self, an int that indicates the number of plies to look ahead, and an
 int that is the value of the player's discs.  The pick_move() method will take
-self, and a 2D int list of the board's current layout. This will be
-column-major, with space 0,0 meaning the lower-left location. It will return an
-int, indicating the column in which it wishes to play. (Note that if a column is
-full, playing there is an invalid move.)
+self, and a copy of the board's current layout, which can be read like a 2D int
+list. This will be column-major, with space 0,0 meaning the lower-left location.
+(It is really a Rack, so players that know about bitboards may also read its
+"boards" and "heights" fields directly.) It will return an int, indicating the
+column in which it wishes to play. (Note that if a column is full, playing
+there is an invalid move.) Since the rack is a copy, a player may also search
+it in place: place_disc(rack, player_number, column) drops a disc on top of a
+column, and undo_disc(rack, column) takes the top disc of a column back out
+again.
+
+A ComputerPlayer may also have a pick_move_ab() method, which is used instead
+of pick_move() if it exists. It takes the rack, an alpha-beta window (alpha,
+beta), and a deadline in time.monotonic() seconds, after which it should stop
+deepening its search and return the best move found so far. This is the place
+for iterative deepening with move ordering (killer moves, history heuristic).
 
 This is version 2.0, which includes a text-based mode. This isn't as fun, but 
 will work if you can't get the graphics dependencies working.
@@ -25,9 +36,14 @@ __author__ = "Adam A. Smith"
 __license__ = "MIT"
 __date__ = "September 2019"
 
+import os
 import sys
+import argparse
+import importlib
 import random
-from functools import partial
+import time
+from functools import partial, lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 ################################################################################
 # CONSTANTS
@@ -41,10 +57,12 @@ SQUARE_SIZE = 100
 FRAME_TIME = 25
 GRAVITY = 20
 DEFAULT_AI_LEVEL = 4
+AI_TIME_LIMIT = 5.0 # seconds, for AIs with pick_move_ab()
 DEFAULT_AI_FILE = "connect4player"
 
 # AUTOMATIC CONSTANTS--DON'T MESS WITH THESE
 HALF_SQUARE = SQUARE_SIZE // 2
+IMAGE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "connect4")
 
 # ANSI ESCAPE SEQUENCES TO MAKE ASCII MODE IN COLOR--MAY NOT ALWAYS WORK
 P1_ESCAPE = "\33[91m\33[1m"
@@ -58,6 +76,75 @@ BOARD_ESCAPE = "\33[90m"
 class HumanPlayer:
     pass
 
+################################################################################
+# RACK CLASS
+################################################################################
+class Rack:
+    """
+    The rack, stored as a pair of bitboards (one int per player). Each column
+    gets num_rows+1 bits, with space 0,0 (the lower-left) as bit 0. The extra
+    bit on top of each column is always empty, so a line of discs can never
+    wrap around from the top of one column into the bottom of the next.
+
+    For reading, a Rack still acts like a column-major 2D list: rack[c][r] is
+    0, 1, or 2, and slicing it gives a tuple of columns. Racks compare equal
+    (and hash the same) when all their columns do, so a player can memoize on
+    one--though its hash changes if the rack is changed afterwards. (Each
+    column is a tuple, made on first use and kept until that column changes.) Use place_disc() to actually change it.
+    """
+    def __init__(self, num_columns = 7, num_rows = 6):
+        self.num_columns = num_columns
+        self.num_rows = num_rows
+        self.boards = [None, 0, 0]         # indexed by player number
+        self.heights = [0] * num_columns   # number of discs in each column
+        self._columns = [None] * num_columns  # cached views for __getitem__()
+
+        # bits per column, and the masks for the bottom & top rows
+        self.column_height = num_rows + 1
+        self.bottom_mask = sum(1 << (c * self.column_height) for c in range(num_columns))
+        self.top_mask = self.bottom_mask << (num_rows - 1)
+
+        # distance between neighboring bits: up, right, up-right, down-right
+        self.shifts = (1, self.column_height, self.column_height + 1, self.column_height - 1)
+
+    def __len__(self):
+        return self.num_columns
+
+    # return a read-only view of one column, bottom to top (or a tuple of them, for a slice)
+    def __getitem__(self, column):
+        if isinstance(column, slice): return tuple(self[c] for c in range(self.num_columns)[column])
+        if column < 0: column += self.num_columns
+        if column < 0 or column >= self.num_columns: raise IndexError("rack column out of range")
+
+        view = self._columns[column]
+        if view == None:
+            offset = column * self.column_height
+            p1 = self.boards[1] >> offset
+            p2 = self.boards[2] >> offset
+            view = tuple([(1 if p1 >> r & 1 else 2 if p2 >> r & 1 else 0) for r in range(self.num_rows)])
+            self._columns[column] = view
+        return view
+
+    def __iter__(self):
+        for c in range(self.num_columns): yield self[c]
+
+    # racks compare & hash by their column views, the same as a tuple of columns would
+    def __eq__(self, other):
+        if isinstance(other, Rack): other = tuple(other)
+        return tuple(self) == other
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    # return an independent copy--just two ints & the heights, so it's cheap
+    def copy(self):
+        rack = Rack.__new__(Rack)
+        rack.__dict__.update(self.__dict__)
+        rack.boards = self.boards[:]
+        rack.heights = self.heights[:]
+        rack._columns = self._columns[:]
+        return rack
+
 ################################################################################
 # APPLICATION CLASS & GRAPHICS STUFF
 ################################################################################
@@ -100,8 +187,13 @@ if do_graphics:
             self.dark_strs = (None, App._make_color_string(App._darken(player_color_tuples[1])), App._make_color_string(App._darken(player_color_tuples[2])))
             self.light_strs = (None, App._make_color_string(App._lighten(player_color_tuples[1])), App._make_color_string(App._lighten(player_color_tuples[2])))
 
+            # button colors for each player, so switching players is just one config() call
+            self._button_styles = [None] + [dict(fg=self.dark_strs[p], bg=self.color_strs[p],
+                                                 activeforeground=self.color_strs[p], activebackground=self.light_strs[p],
+                                                 highlightcolor="#ff0000", disabledforeground=self.color_strs[p]) for p in (1, 2)]
+
             # make the necessary images
-            self.overlay_image = self._make_rack_image()
+            self.overlay_image = self._make_rack_image(num_columns, num_rows)
             self.disc1_image = self._make_disc_image(player_color_tuples[1])
             self.disc2_image = self._make_disc_image(player_color_tuples[2])
             self.wm_iconphoto(self, App._make_icon(player_color_tuples[1], player_color_tuples[2]))
@@ -109,6 +201,7 @@ if do_graphics:
             # other data structures
             #self.rack = [[0 for x in range(num_rows)] for y in range(num_columns)]
             self.rack = make_rack(num_columns, num_rows)
+            self._pool = ThreadPoolExecutor(max_workers=1) # for AIs to think in
 
             # start forming up the screen--here's the top banner
             self.top_banner = tk.Label(self, bg=BACKGROUND_COLOR, font=("Arial", 20))
@@ -121,14 +214,16 @@ if do_graphics:
                 b.grid(column=(i+1), row=2, pady=10)
                 self.buttons.append(b)
 
+            # what the buttons are currently set to, so we only send Tk the changes
+            self._button_player = None
+            self._button_states = [tk.NORMAL] * num_columns
+
             self.canvas = tk.Canvas(width = num_columns*SQUARE_SIZE, height = num_rows*SQUARE_SIZE, bg=BACKGROUND_COLOR, highlightthickness=0)
             self.canvas.grid(column=1, row=3, columnspan=num_columns)
 
             self.discs = []
-            # make the rack
-            for r in range(num_rows):
-                for c in range(num_columns):
-                    self.canvas.create_image((c*SQUARE_SIZE+HALF_SQUARE,r*SQUARE_SIZE+HALF_SQUARE), image=self.overlay_image)
+            # make the rack (one image for the whole thing)
+            self.canvas.create_image((num_columns*SQUARE_SIZE//2, num_rows*SQUARE_SIZE//2), image=self.overlay_image)
 
             # random player goes 1st
             self._set_player(random.randrange(1,3))
@@ -139,29 +234,26 @@ if do_graphics:
             if player_num == None: player_num = self.current_player
 
             # disable all the buttons while the disc is dropping
-            for b in self.buttons: b.config(state=tk.DISABLED)
+            self._set_buttons(self._button_player, False)
             
             # figure out where the thing drops to
-            end_row = 0
-            while self.rack[location][end_row] != 0: end_row += 1
-            end_y = (len(self.rack[0]) - end_row) * SQUARE_SIZE - HALF_SQUARE
-            self.rack[location][end_row] = player_num
+            end_x, end_y = self._cell_center(location, self.rack.heights[location])
+            place_disc(self.rack, player_num, location)
 
-            # create the new disc
-            start = (location*SQUARE_SIZE + HALF_SQUARE, -HALF_SQUARE)
+            # create the new disc, just above the top of the canvas
             if player_num == 1: image = self.disc1_image
             else: image = self.disc2_image
-            new_disc = self.canvas.create_image((location*SQUARE_SIZE + HALF_SQUARE, -HALF_SQUARE), image=image)
+            new_disc = self.canvas.create_image((end_x, -HALF_SQUARE), image=image)
             self.canvas.lower(new_disc)
 
             # start the dropping process
-            self.after(1, self._continue_drop, new_disc, 0, end_y)
+            self.after(1, self._continue_drop, new_disc, 0, -HALF_SQUARE, end_y)
 
-        # animate the disc as it continues to drop
-        def _continue_drop(self, which_disc, speed, final_y):
+        # animate the disc as it continues to drop (we track its y ourselves,
+        # rather than asking the canvas for its coords every frame)
+        def _continue_drop(self, which_disc, speed, current_y, final_y):
             # gravity calcs
             speed += GRAVITY
-            current_y = int(self.canvas.coords(which_disc)[1])
 
             # on end, get the token down, and start up final checks
             if current_y + speed >= final_y:
@@ -171,7 +263,7 @@ if do_graphics:
             # move the disc, and continue dropping
             else:
                 self.canvas.move(which_disc, 0, speed)
-                self.after(FRAME_TIME, self._continue_drop, which_disc, speed, final_y)
+                self.after(FRAME_TIME, self._continue_drop, which_disc, speed, current_y + speed, final_y)
 
         # check for victory, swap player
         def _finish_turn(self, dropped_disc):
@@ -186,15 +278,27 @@ if do_graphics:
         # handle the UI aspect of the victory
         def _declare_victory(self, winner, win_location):
             self.top_banner.config(text="Player " +str(winner) + " wins!", fg=self.light_strs[self.current_player])
-            num_rows = len(self.rack[0])
-            coords = [(x[0]*SQUARE_SIZE+HALF_SQUARE, (num_rows-1-x[1])*SQUARE_SIZE+HALF_SQUARE) for x in win_location]
-            self.canvas.create_line(coords[0][0], coords[0][1], coords[1][0], coords[1][1], fill=self.light_strs[winner], width=SQUARE_SIZE/10, capstyle=tk.ROUND)
-
-        # set a button to the colors of the given player
-        def _set_button_colors(self, button, player):
-            button.config(fg = self.dark_strs[player], bg = self.color_strs[player],
-                          activeforeground=self.color_strs[player], activebackground=self.light_strs[player],
-                          highlightcolor="#ff0000", disabledforeground=self.color_strs[player])
+            start = self._cell_center(*win_location[0])
+            end = self._cell_center(*win_location[1])
+            self.canvas.create_line(start[0], start[1], end[0], end[1], fill=self.light_strs[winner], width=SQUARE_SIZE/10, capstyle=tk.ROUND)
+
+        # return the canvas (x,y) of the center of a space in the rack (row 0 is at the bottom)
+        def _cell_center(self, column, row):
+            return (column*SQUARE_SIZE + HALF_SQUARE, (self.rack.num_rows-1-row)*SQUARE_SIZE + HALF_SQUARE)
+
+        # set the buttons to the given player's colors, and enable the ones for
+        # non-full columns (or disable them all)--one config() per button, tops
+        def _set_buttons(self, player, enabled):
+            if player == self._button_player: style = {}
+            else: style = self._button_styles[player]
+            self._button_player = player
+
+            for b in range(len(self.buttons)):
+                if enabled and is_legal_move(self.rack, b): state = tk.NORMAL
+                else: state = tk.DISABLED
+                if style or state != self._button_states[b]:
+                    self.buttons[b].config(state=state, **style)
+                    self._button_states[b] = state
 
         # switch players
         def _swap_player(self):
@@ -208,31 +312,35 @@ if do_graphics:
             # if the next player is human, set the banner & activate the appropriate buttons
             if type(self.players[player_id]) == HumanPlayer:
                 self.top_banner.config(text="Player " +str(self.current_player), fg=self.color_strs[self.current_player])
-                for b in range(len(self.buttons)):
-                    self._set_button_colors(self.buttons[b], self.current_player)
-                    if self.rack[b][-1] == 0: self.buttons[b].config(state=tk.NORMAL)
+                self._set_buttons(self.current_player, True)
 
             # if it's an AI, disable buttons & start up its turn
             else:
                 self.top_banner.config(text="Player " +str(self.current_player)+ " is thinking...", fg=self.color_strs[self.current_player])
-                for b in self.buttons:
-                    self._set_button_colors(b, self.current_player)
-                    b.config(state=tk.DISABLED)
+                self._set_buttons(self.current_player, False)
 
                 self.after(50, self._do_computer_turn)
 
-        # let the computer take a turn
+        # let the computer take a turn--it thinks in the background, so the
+        # window stays responsive in the meantime
         def _do_computer_turn(self):
-            # pass the player a tuple (so it can't mess with the original rack)
-            rack_tuple = tuple([tuple(column) for column in self.rack])
-            move = self.players[self.current_player].pick_move(rack_tuple)
+            future = self._pool.submit(do_computer_turn, self.rack, self.players[self.current_player])
+            self.after(FRAME_TIME, self._check_computer_turn, future)
 
-            # checks to make sure that the AI has made a valid move
-            assert move >=0 and move < len(self.rack)
-            assert self.rack[move][-1] == 0
-            
+        # once the computer has picked its move, make it
+        def _check_computer_turn(self, future):
+            if not future.done():
+                self.after(FRAME_TIME, self._check_computer_turn, future)
+                return
+
+            move = future.result()
             self.top_banner.config(text="Player " +str(self.current_player))
             self._drop_disc(move)
+
+        # don't start any more AI turns once the window is closed
+        def destroy(self):
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            tk.Tk.destroy(self)
             
         # take in a color string or tuple, return a tuple
         @staticmethod
@@ -250,49 +358,85 @@ if do_graphics:
         # return a darker version of the passed color tuple
         @staticmethod
         def _darken(color):
-            return (color[0]//2, color[1]//2, color[2]//2, color[3])
+            return tuple([x >> 1 for x in color[:3]]) + (color[3],)
 
         # return a lighter version of the passed color tuple
         @staticmethod
         def _lighten(color):
-            return ((color[0]+255)//2, (color[1]+255)//2, (color[2]+255)//2, color[3])
+            return tuple([(x + 255) >> 1 for x in color[:3]]) + (color[3],)
 
         # given a color tuple, return a string in the form "#rrggbb"
         @staticmethod
         def _make_color_string(color_tuple):
-            return "#" +hex(256*65536 + 65536 * color_tuple[0] + 256 * color_tuple[1] + color_tuple[2])[3:]
+            return "#%02x%02x%02x" % tuple(color_tuple[:3])
 
-        # make an image for one square in the rack
+        # load a PIL image from the on-disk cache, or call render() to make it &
+        # save it there for next time (if we can't write there, just skip it)
+        @staticmethod
+        def _cached_image(name, render):
+            path = os.path.join(IMAGE_CACHE_DIR, name + ".png")
+            try:
+                im = Image.open(path)
+                im.load()
+                return im
+            except OSError: pass
+
+            im = render()
+            try:
+                os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+                im.save(path)
+            except OSError: pass
+            return im
+
+        # make an image of the whole rack
         @staticmethod
-        def _make_rack_image():
-            # start by making something double-size, so we can shrink it and get anti-aliasing
-            im = Image.new("RGBA", (2*SQUARE_SIZE,2*SQUARE_SIZE), App._make_color_tuple(RACK_COLOR)) #(255,255,0,255))
-            draw = ImageDraw.Draw(im)
-            edge = int(SQUARE_SIZE * 0.2)
-            draw.ellipse((edge, edge, 2*SQUARE_SIZE-edge, 2*SQUARE_SIZE-edge), fill=(0,0,0,0))
-            return ImageTk.PhotoImage(im.resize((SQUARE_SIZE, SQUARE_SIZE), resample=Image.BICUBIC))
+        def _make_rack_image(num_columns, num_rows):
+            color = App._make_color_tuple(RACK_COLOR)
+            def render():
+                # start by making one square double-size, so we can shrink it and get anti-aliasing
+                square = Image.new("RGBA", (2*SQUARE_SIZE,2*SQUARE_SIZE), color) #(255,255,0,255))
+                draw = ImageDraw.Draw(square)
+                edge = int(SQUARE_SIZE * 0.2)
+                draw.ellipse((edge, edge, 2*SQUARE_SIZE-edge, 2*SQUARE_SIZE-edge), fill=(0,0,0,0))
+                square = square.resize((SQUARE_SIZE, SQUARE_SIZE), resample=Image.BICUBIC)
+
+                # then tile it across the rack
+                im = Image.new("RGBA", (num_columns*SQUARE_SIZE, num_rows*SQUARE_SIZE))
+                for c in range(num_columns):
+                    for r in range(num_rows): im.paste(square, (c*SQUARE_SIZE, r*SQUARE_SIZE))
+                return im
+
+            name = "rack-%dx%d-%d-%02x%02x%02x%02x" % ((num_columns, num_rows, SQUARE_SIZE) + color)
+            return ImageTk.PhotoImage(App._cached_image(name, render))
 
         # make a disc out of the passed color
         @staticmethod
         def _make_disc_image(color):
-            im = Image.new("RGBA", (2*SQUARE_SIZE,2*SQUARE_SIZE), (0,0,0,0))
-            draw = ImageDraw.Draw(im)
-
             color = App._make_color_tuple(color)
-            dark = (color[0]//2, color[1]//2, color[2]//2, color[3])
-    
-            draw.ellipse((0, 0, 2*SQUARE_SIZE, 2*SQUARE_SIZE), color, dark)
-            draw.ellipse((50, 50, 2*SQUARE_SIZE-50, 2*SQUARE_SIZE-50), None, dark)
-            return ImageTk.PhotoImage(im.resize((SQUARE_SIZE, SQUARE_SIZE), resample=Image.BICUBIC))
+            def render():
+                im = Image.new("RGBA", (2*SQUARE_SIZE,2*SQUARE_SIZE), (0,0,0,0))
+                draw = ImageDraw.Draw(im)
+                dark = App._darken(color)
+        
+                draw.ellipse((0, 0, 2*SQUARE_SIZE, 2*SQUARE_SIZE), color, dark)
+                draw.ellipse((50, 50, 2*SQUARE_SIZE-50, 2*SQUARE_SIZE-50), None, dark)
+                return im.resize((SQUARE_SIZE, SQUARE_SIZE), resample=Image.BICUBIC)
+
+            name = "disc-%d-%02x%02x%02x%02x" % ((SQUARE_SIZE,) + color)
+            return ImageTk.PhotoImage(App._cached_image(name, render))
 
         # make an 64x64 image of a "4" on a disc
         @staticmethod
         def _make_icon(color1, color2):
-            im = Image.new("RGBA", (100,100), (0,0,0,0))
-            draw = ImageDraw.Draw(im)
-            draw.ellipse((0, 0, 100, 100), color2)
-            draw.line(((53,93),(69,14),(21,62),(78,60)), fill=color1, width=12)
-            return ImageTk.PhotoImage(im.resize((64, 64), resample=Image.BICUBIC))
+            def render():
+                im = Image.new("RGBA", (100,100), (0,0,0,0))
+                draw = ImageDraw.Draw(im)
+                draw.ellipse((0, 0, 100, 100), color2)
+                draw.line(((53,93),(69,14),(21,62),(78,60)), fill=color1, width=12)
+                return im.resize((64, 64), resample=Image.BICUBIC)
+
+            name = "icon-%02x%02x%02x%02x-%02x%02x%02x%02x" % (color1 + color2)
+            return ImageTk.PhotoImage(App._cached_image(name, render))
             
 # error to print out if we couldn't load up graphics
 #except ImportError:
@@ -308,60 +452,59 @@ def load_player(player_id, module_name = None, level = 1):
     Load up a ComputerPlayer class from the given module. A module of None means 
     a human player.
     """
-    class_name = "Player" +str(player_id)+ "Class"
-
     # if module_name is None, that means we have a human player
-    if module_name == None:
-        exec(class_name + " = HumanPlayer", globals())
-        return HumanPlayer()
+    if module_name == None: return HumanPlayer()
 
     # look for the file specified, see if we have a proper ComputerPlayer
     try:
-        exec("from " +module_name+ " import ComputerPlayer as " +class_name, globals())
-    except ImportError:
+        player_class = getattr(importlib.import_module(module_name), "ComputerPlayer")
+    except (ImportError, AttributeError):
         print("Could not find ComputerPlayer in file \"" +module_name+ ".py\". Exiting.", file=sys.stderr)
         sys.exit(1)
 
-    # make a local pointer to the ComputerPlayer class, and return a new instance
-    exec("Player = " +class_name)
-    return locals()["Player"](player_id, level)
+    return player_class(player_id, level)
 
 def parse_command_line_args(args):
     """
     Search the command-line args for the various options (see the help function).
     """
-    print(args)
+    # the help message is our own (see print_help()), so argparse's is turned off
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("-h", "--help", action="store_true")
+    parser.add_argument("-0", dest="zero_player", action="store_true")
+    parser.add_argument("-1", dest="one_player", action="store_true")
+    parser.add_argument("-2", dest="two_player", action="store_true")
+    parser.add_argument("-c", dest="colors")
+    parser.add_argument("-f", dest="ai_file", default=DEFAULT_AI_FILE)
+    parser.add_argument("-l", dest="levels")
+    parser.add_argument("-n", "--nographics", action="store_true")
+    options = parser.parse_known_args(args)[0]
+
     # print help message
-    if "-h" in args or "--help" in args: print_help = True
-    else: print_help = False
+    print_help = options.help
 
     # AI file
-    if "-f" in args: ai_file = args[args.index("-f") + 1].rstrip(".py")
-    else: ai_file = DEFAULT_AI_FILE
+    ai_file = options.ai_file
+    if ai_file.endswith(".py"): ai_file = ai_file[:-3]
     
     # number of players
-    if "-0" in args: players = (ai_file, ai_file)
-    elif "-2" in args: players = (None, None)
+    if options.zero_player: players = (ai_file, ai_file)
+    elif options.two_player: players = (None, None)
     else: players = (None, ai_file)
 
     # level of players
-    if "-l" in args:
-        levels = args[args.index("-l") + 1].split(',')
-        print(levels)
+    if options.levels:
+        levels = options.levels.split(',')
         if len(levels) == 1: levels = (int(levels[0]), int(levels[0]))
         else: levels = (int(levels[0]), int(levels[1]))
     else: levels = (DEFAULT_AI_LEVEL, DEFAULT_AI_LEVEL)
-    print(levels)
 
     # colors
-    if "-c" in args:
-        color_string = args[args.index("-c") + 1]
-        colors = color_string.split(',')
+    if options.colors: colors = options.colors.split(',')
     else: colors = None
         
     # manually turn off the graphics
-    if "-n" in args or "--nographics" in args: graphics_wanted = False
-    else: graphics_wanted = True
+    graphics_wanted = not options.nographics
     
     return (print_help, players, levels, colors, graphics_wanted)
 
@@ -424,39 +567,52 @@ def do_human_turn(rack, player):
         except ValueError:
             column = -1
 
-        if column >= 0 and column < len(rack) and rack[column][-1] == 0: return column
+        if column >= 0 and column < len(rack) and is_legal_move(rack, column): return column
         else: print("INVALID")
     
         
 def do_computer_turn(rack, player):
-    # pass the player a tuple (so it can't mess with the original rack)
-    rack_tuple = tuple([tuple(column) for column in rack])
-    move = player.pick_move(rack_tuple)
+    # pass the player a copy (so it can't mess with the original rack), along
+    # with a full window & a deadline if it knows how to use them
+    if hasattr(player, "pick_move_ab"):
+        move = player.pick_move_ab(rack.copy(), float("-inf"), float("inf"), time.monotonic() + AI_TIME_LIMIT)
+    else: move = player.pick_move(rack.copy())
 
     # checks to make sure that the AI has made a valid move
     assert move >=0 and move < len(rack)
-    assert rack[move][-1] == 0
+    assert is_legal_move(rack, move)
 
     return move
     
 def place_disc(rack, player_number, column):
-    # figure out where the thing drops to
-    row = 0
-    while rack[column][row] != 0: row += 1
-    rack[column][row] = player_number
+    # the disc drops onto the top of the column
+    row = rack.heights[column]
+    rack.boards[player_number] |= 1 << (column * rack.column_height + row)
+    rack.heights[column] = row + 1
+    rack._columns[column] = None
+
+def undo_disc(rack, column):
+    # take the top disc back out of the column (undoes place_disc)
+    row = rack.heights[column] - 1
+    keep = ~(1 << (column * rack.column_height + row))
+    rack.boards[1] &= keep
+    rack.boards[2] &= keep
+    rack.heights[column] = row
+    rack._columns[column] = None
         
+# return True if the column has room for another disc
+def is_legal_move(rack, column):
+    return rack.heights[column] < rack.num_rows
+
 # return True if there exists at least 1 valid move
 def exists_legal_move(rack):
-    for c in range(len(rack)):
-        if rack[c][-1] == 0: return True
-    return False
+    return (rack.boards[1] | rack.boards[2]) & rack.top_mask != rack.top_mask
 
 def make_rack(num_columns = 7, num_rows = 6):
     """
-    Create the basic rack object. (Just a list, really.)
+    Create the basic rack object. (See the Rack class.)
     """
-    rack = [[0 for x in range(num_rows)] for y in range(num_columns)]
-    return rack
+    return Rack(num_columns, num_rows)
 
 def print_rack(rack):
     # print numbers on top (doesn't work with 100 or more columns)
@@ -468,60 +624,80 @@ def print_rack(rack):
     for i in range(len(rack)): print(str((i+1)%10), end=" ")
     print()
 
-    # print the rack itself
-    for r in range(len(rack[0])-1, -1, -1):
-        for c in range(len(rack)):
-            if rack[c][r] == 1: print(P1_ESCAPE + "X" + END_ESCAPE, end=" ")
-            elif rack[c][r] == 2: print(P2_ESCAPE + "O" + END_ESCAPE, end=" ")
+    # print the rack itself (pulling each column out of the bitboards just once)
+    columns = list(rack)
+    for r in range(rack.num_rows-1, -1, -1):
+        for cell in [column[r] for column in columns]:
+            if cell == 1: print(P1_ESCAPE + "X" + END_ESCAPE, end=" ")
+            elif cell == 2: print(P2_ESCAPE + "O" + END_ESCAPE, end=" ")
             else: print(BOARD_ESCAPE + "." + END_ESCAPE, end=" ")
         print()
 
 def find_win(rack, column = None):
-    # if no column explicitly given, do them all recursively
+    # if no column explicitly given, scan each whole board at once--the lowest
+    # set bit left after the shift-ANDs is the start of a line
     if column == None:
-        for c in range(len(rack)):
-            win = find_win(c)
-            if win: return win
+        for board in rack.boards[1:]:
+            for shift in rack.shifts:
+                pairs = board & (board >> shift)
+                starts = pairs & (pairs >> 2*shift)
+                if starts: return _find_line(board, (starts & -starts).bit_length() - 1, rack.num_columns, rack.num_rows)
         return None
 
-    num_cols = len(rack)
-    num_rows = len(rack[0])
-    
-    # figure out where the disc was dropped
-    row = num_rows - 1
-    while row > -1 and rack[column][row] == 0: row -= 1
-    if row == -1: return None            
-
-    player = rack[column][row]
-
-    # check for vertical win
-    if row >= 3:
-        subrack = rack[column]
-        if subrack[row] == subrack[row-1] and subrack[row] == subrack[row-2] and subrack[row] == subrack[row-3]:
-            return ((column, row-3), (column, row))
-
-    # check for horizontal win
-    c = d = column
-    while c > 0 and rack[c-1][row] == player: c -= 1
-    while d < (num_cols-1) and rack[d+1][row] == player: d += 1
-    if (d-c) >= 3: return ((c, row), (d, row))
-
-    # check for forward-diagonal win
-    c = d = column
-    r = s = row
-    while c > 0 and r > 0 and rack[c-1][r-1] == player: c -= 1; r -= 1
-    while d < (num_cols-1) and s < (num_rows-1) and rack[d+1][s+1] == player: d += 1; s+=1
-    if (d-c) >= 3: return ((c, r), (d, s))
-    
-    # check for backward-diagonal win
-    c = d = column
-    r = s = row
-    while c > 0 and r < (num_rows-1) and rack[c-1][r+1] == player: c -= 1; r += 1
-    while d < (num_cols-1) and s > 0 and rack[d+1][s-1] == player: d += 1; s-=1
-    if (d-c) >= 3: return ((c, r), (d, s))
+    # figure out where the disc was dropped, and whose it is
+    row = rack.heights[column] - 1
+    if row == -1: return None
+    cell = column * rack.column_height + row
+    if rack.boards[1] >> cell & 1: board = rack.boards[1]
+    else: board = rack.boards[2]
+
+    return _find_line(board, cell, rack.num_columns, rack.num_rows)
+
+def _find_line(board, cell, num_columns, num_rows):
+    """
+    Look for a line of 4 or more through the given cell of a player's bitboard,
+    and return its ends as (column, row) pairs (or None if there isn't one).
+    """
+    height = num_rows + 1
+
+    # quick check: shifting & ANDing the board finds any 4 in a row at all
+    for shift in (1, height, height + 1, height - 1):
+        pairs = board & (board >> shift)
+        if pairs & (pairs >> 2*shift): break
+    else: return None
+
+    # check each direction (vertical, horizontal, both diagonals): merge all the
+    # filled lines through the cell, and the lowest & highest bits are the ends
+    for lines in _win_lines(num_columns, num_rows)[cell]:
+        merged = 0
+        for line in lines:
+            if board & line == line: merged |= line
+        if merged: return (divmod((merged & -merged).bit_length() - 1, height), divmod(merged.bit_length() - 1, height))
 
     # no win detected--return None
     return None
+
+@lru_cache(maxsize=None)
+def _win_lines(num_columns, num_rows):
+    """
+    Make the table of all possible winning lines (as bitmasks) for a rack of
+    the given size. This maps each cell to the lines through it, grouped by
+    direction: vertical, horizontal, up-right, and down-right.
+    """
+    height = num_rows + 1
+    table = {}
+    for c in range(num_columns):
+        for r in range(num_rows): table[c*height + r] = ([], [], [], [])
+
+    for direction, (dc, dr) in enumerate(((0, 1), (1, 0), (1, 1), (1, -1))):
+        for c in range(num_columns):
+            for r in range(num_rows):
+                cells = [(c + k*dc, r + k*dr) for k in range(4)]
+                if not all(0 <= x < num_columns and 0 <= y < num_rows for x, y in cells): continue
+                line = sum(1 << (x*height + y) for x, y in cells)
+                for x, y in cells: table[x*height + y][direction].append(line)
+
+    return {cell: tuple(tuple(lines) for lines in directions) for cell, directions in table.items()}
     
 
 ################################################################################
@@ -5,42 +5,224 @@ __author__ = "Lucas Gover"
 __license__ = "UPS"
 __date__ = "February 2022"
 
+import itertools
+import multiprocessing
+import os
 import random
-import threading
+import time
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+#kinds of transposition table entries: exact scores, and lower/upper bounds
+EXACT = 0
+LOWER = 1
+UPPER = 2
+TT_SIZE = 2000000 # most positions to remember at once
+CLOCK_CHECK_NODES = 1000 # when there's a deadline, look at the clock once per this many positions searched
+PARALLEL_DEPTH = 10 # searches at least this deep split the moves up between processes (if there's more than 1 CPU)
+WORKER_TT_SIZE = 100000 # most positions each worker process remembers at once (a full TT_SIZE table takes a few hundred MB)
+
+#score of a set of 4 holding this many of one player's discs (and none of the other's),
+#and how much adding one more disc to it gains
+WINDOW_SCORES = (0, 1, 10, 100, 10000000)
+WINDOW_GAINS = tuple(WINDOW_SCORES[n + 1] - WINDOW_SCORES[n] for n in range(4))
+
+#every set of 4 spots in a row on a board this size, each as a bitmask (using the
+#same bit numbers as Bitboard), and the sets that go through each bit. These only
+#depend on the board size, so they're only worked out once
+@lru_cache
+def _make_windows(num_collumns, num_rows):
+    h = num_rows + 1
+    windows = []
+    for i in range(num_collumns): #up and down
+        for j in range(num_rows - 3):
+            windows.append((1 << i*h+j) | (1 << i*h+j+1) | (1 << i*h+j+2) | (1 << i*h+j+3))
+    for i in range(num_collumns - 3): #sideways
+        for j in range(num_rows):
+            windows.append((1 << i*h+j) | (1 << (i+1)*h+j) | (1 << (i+2)*h+j) | (1 << (i+3)*h+j))
+    for i in range(num_collumns - 3): #diagonal North east
+        for j in range(num_rows - 3):
+            windows.append((1 << i*h+j) | (1 << (i+1)*h+j+1) | (1 << (i+2)*h+j+2) | (1 << (i+3)*h+j+3))
+    for i in range(num_collumns - 3): #diagonal North West
+        for j in range(num_rows - 3):
+            windows.append((1 << i*h+j+3) | (1 << (i+1)*h+j+2) | (1 << (i+2)*h+j+1) | (1 << (i+3)*h+j))
+
+    windows_through = tuple(tuple(w for w in windows if w >> spot & 1) for spot in range(num_collumns * h))
+    return tuple(windows), windows_through
+
+class Bitboard:
+    """
+    A Connect Four board stored as two bitmasks: position holds the discs of
+    the player whose turn it is, and mask holds every disc. Each collumn gets
+    num_rows+1 bits (bottom to top), with the extra bit on top always empty so
+    a line of discs can't wrap into the next collumn.
+    """
+
+    def __init__(self, rack, id):
+        self.num_collumns = len(rack)
+        self.num_rows = len(rack[0])
+        self.height = self.num_rows + 1
+        self.position = 0
+        self.mask = 0
+        self.heights = [0] * self.num_collumns # number of discs in each collumn
+
+        #copy the rack in, with id as the player to move
+        for i in range(self.num_collumns):
+            for j in range(self.num_rows):
+                if rack[i][j] == 0:
+                    continue
+                bit = 1 << (i * self.height + j)
+                self.mask |= bit
+                if rack[i][j] == id:
+                    self.position |= bit
+                self.heights[i] = j + 1
+
+        self.shifts = (1, self.height, self.height + 1, self.height - 1) # up, right, up-right, down-right
+        self.column_mask = (1 << self.height) - 1
+        self.bottom_mask = sum(1 << (i * self.height) for i in range(self.num_collumns))
+        self.full_mask = sum(((1 << self.num_rows) - 1) << (i * self.height) for i in range(self.num_collumns))
+
+        #order to try moves in: middle collumns first, since they usually lead to
+        #more cutoffs. orders[i] is the same, but with collumn i moved to the front
+        middle = (self.num_collumns - 1) / 2
+        self.order = tuple(sorted(range(self.num_collumns), key=lambda i: abs(i - middle)))
+        self.orders = [(i,) + tuple(x for x in self.order if x != i) for i in range(self.num_collumns)]
+
+        #every set of 4 spots in a row (as a bitmask), and which sets go through each spot
+        self.windows, self.windows_through = _make_windows(self.num_collumns, self.num_rows)
+
+        #the same two bitmasks for the board flipped left to right
+        self.mirror_position = 0
+        self.mirror_mask = 0
+        for i in range(self.num_collumns):
+            self.mirror_position |= ((self.position >> (i * self.height)) & self.column_mask) << ((self.num_collumns-1-i) * self.height)
+            self.mirror_mask |= ((self.mask >> (i * self.height)) & self.column_mask) << ((self.num_collumns-1-i) * self.height)
+
+    #a number that's different for every board (and the same for equal ones):
+    #adding mask to position can't carry into the next collumn, since each collumn's
+    #discs in mask are a solid run from the bottom
+    def key(self):
+        return self.position + self.mask
+
+    #the key of the board flipped left to right
+    def mirror_key(self):
+        return self.mirror_position + self.mirror_mask
+
+    #drops a disc for the player to move, and passes the turn
+    def play(self, collumn):
+        spot = collumn * self.height + self.heights[collumn]
+        self.position ^= self.mask
+        self.mask |= 1 << spot
+        self.mirror_position ^= self.mirror_mask
+        self.mirror_mask |= 1 << (spot + (self.num_collumns-1-2*collumn) * self.height)
+        self.heights[collumn] += 1
+
+    #takes back the top disc of the collumn (undoes play)
+    def undo(self, collumn):
+        self.heights[collumn] -= 1
+        spot = collumn * self.height + self.heights[collumn]
+        self.mask ^= 1 << spot
+        self.position ^= self.mask
+        self.mirror_mask ^= 1 << (spot + (self.num_collumns-1-2*collumn) * self.height)
+        self.mirror_position ^= self.mirror_mask
+
+    #finds the spots in legal (from legal_moves) a player could drop a disc in to get 4 in a row:
+    #for each direction, a spot wins if it has 3 of the player's discs next to it in
+    #some mix of that direction and the opposite one
+    def winning_moves(self, discs, legal):
+        wins = (discs << 1) & (discs << 2) & (discs << 3) # 3 discs right below
+        for shift in self.shifts[1:]:
+            pairs = (discs << shift) & (discs << 2 * shift)
+            wins |= pairs & ((discs << 3 * shift) | (discs >> shift))
+            pairs = (discs >> shift) & (discs >> 2 * shift)
+            wins |= pairs & ((discs << shift) | (discs >> 3 * shift))
+        return wins & legal
+
+    #the spots a disc can be dropped in right now (the lowest empty spot of each
+    #collumn that isn't full): adding 1 to the bottom of each collumn carries up
+    #through its discs into the first empty spot
+    def legal_moves(self):
+        return (self.mask + self.bottom_mask) & self.full_mask
+
+    #checks if every spot on the board is taken
+    def is_full(self):
+        return self.mask == self.full_mask
+
+#players used by the worker processes to score moves from the root, one for each id
+#(each keeps its own, smaller, transposition table between searches)
+_worker_players = {}
+
+#runs in a worker process: scores playing in collumn for id, the same way
+#ComputerPlayer._search_moves does (returns None if it runs past the deadline)
+def _search_child(rack, id, collumn, depth, alpha, beta, deadline):
+    if id not in _worker_players:
+        _worker_players[id] = ComputerPlayer(id, depth)
+        _worker_players[id].tt_size = WORKER_TT_SIZE
+    player = _worker_players[id]
+    player._check_board_size(rack)
+
+    board = Bitboard(rack, id)
+    player._forget_old_entries(board)
+    board_score = player._score_board(board)
+    change = player._play_and_score(board,collumn)
+    player.deadline = deadline
+    try:
+        return player._minimax_with_alpha_beta_pruning(board,depth - 1,-1 * beta,-1 * alpha,-1 * (board_score + change)) * -1
+    except _OutOfTime:
+        return None
+
+#raised from deep in a search once the deadline has passed, to stop it right away
+class _OutOfTime(Exception):
+    pass
 
 class ComputerPlayer:
 
     def __init__(self, id, difficulty_level):
         self.id = id
         self.difficulty_level = difficulty_level
+        self.board_size = None # (collumns, rows) of the board the transposition table is for
+        self.tt = {} # transposition table: board key -> (score, depth, kind of entry, best collumn, number of discs)
+        self.tt_size = TT_SIZE # most positions to remember at once
+        self.root_ply = None # number of discs on the board at the start of the last search
+        self.pool = None # worker processes for deep searches, started the first time they're needed
+        self.deadline = None # time.monotonic() at which the search in progress has to stop (if any)
+        self.nodes = 0 # positions searched, for knowing when to look at the clock
 
     def pick_move(self, rack):
-
-        #make an imaginary list equivalent of the rack, in which the progam can use to test possible moves
-        imaginary_board = [list(row) for row in rack]
-
-        #makes a list of scores, with scores[collumn] storing the score if ComputerPlayer plays in that collumn
-        scores = list()
-
-        #tries out every possible move
-        for i in range(len(rack)):
-
-            #If collumn is full, don't even try it
-            if not (imaginary_board[i][-1] == 0):
-                scores.append(None)
-                continue
-            
-            #find the top open spot in the collumn(where the piece will drop to)
-            top_open_spot = self._find_top_spot_open(rack,i)
-            
-            imaginary_board[i][top_open_spot] = self.id # plays in collumn i on the imaginary board
-
-            #uses minimax to score this new board
-            score = self._minimax_with_alpha_beta_pruning(self._flip_player(self.id),imaginary_board,self.difficulty_level - 1,-100000000,100000000) * -1
-            #print("[{}]: ".format(i+1) + str(score)) # <- use if you want to see what minimax scores each possible move
-
-            scores.append(score) 
-            imaginary_board[i][top_open_spot] = 0 # reset board
+        return self.pick_move_ab(rack, -100000000, 100000000, None)
+
+    #same as pick_move, but only searches the window (alpha, beta), and stops
+    #deepening once time.monotonic() passes the deadline (if there is one)
+    def pick_move_ab(self, rack, alpha, beta, deadline):
+        alpha = max(alpha, -100000000)
+        beta = min(beta, 100000000)
+
+        self._check_board_size(rack)
+
+        #make a bitboard version of the rack, in which the progam can test possible moves
+        imaginary_board = Bitboard(rack, self.id)
+        self._forget_old_entries(imaginary_board)
+
+        #the score of the board for the player to move, which gets updated with each move
+        board_score = self._score_board(imaginary_board)
+
+        #search 1 move ahead, then 2, and so on--each search fills the transposition
+        #table with good moves to try first in the next one. Once time's up, use the
+        #deepest search that finished
+        scores = None
+        for depth in range(1, max(self.difficulty_level, 1) + 1):
+            if depth >= PARALLEL_DEPTH and (os.cpu_count() or 1) > 1:
+                new_scores = self._search_moves_parallel(rack, imaginary_board, depth, alpha, beta, deadline if scores != None else None)
+            else:
+                #try the best move from the last search first
+                if scores == None:
+                    order = imaginary_board.order
+                else:
+                    order = imaginary_board.orders[scores.index(max(score for score in scores if score != None))]
+                new_scores = self._search_moves(imaginary_board, board_score, depth, alpha, beta, deadline if scores != None else None, order)
+            if new_scores == None:
+                break
+            scores = new_scores
         
         best_collumns = [] # stores all the collumns that tie for best score
         best_score = -100000000
@@ -58,56 +240,111 @@ class ComputerPlayer:
         
         return random.choice(best_collumns) # out of the best collumns, choses one
 
-    #returns the score as the current_id_player
-    def _minimax(self,id, board,depth):
-        curr_score = self._eval_function(id,board)
+    #forgets the positions from earlier in the game than board, since there's no way
+    #back to them (every move adds a disc). Everything else is kept for this turn's
+    #search, and the table gets tidied again once the game has moved on
+    def _forget_old_entries(self, board):
+        ply = board.mask.bit_count()
+        if ply == self.root_ply:
+            return
+        self.root_ply = ply
+        for key in [key for key, entry in self.tt.items() if entry[4] < ply]:
+            del self.tt[key]
+
+    #forgets the transposition table if the board size changed, since the same key
+    #means a different board on a different size board
+    def _check_board_size(self, rack):
+        if self.board_size != (len(rack), len(rack[0])):
+            self.board_size = (len(rack), len(rack[0]))
+            self.tt = {}
+
+    #scores each move at the given depth, with scores[collumn] storing the score if
+    #ComputerPlayer plays in that collumn (returns None if it runs past the deadline,
+    #in which case the search stops partway through and board can't be used again)
+    def _search_moves(self, board, board_score, depth, alpha, beta, deadline, order):
+        self.deadline = deadline
+        try:
+            return self._search_moves_until_deadline(board, board_score, depth, alpha, beta, order)
+        except _OutOfTime:
+            return None
+
+    def _search_moves_until_deadline(self, board, board_score, depth, alpha, beta, order):
+        scores = [None] * board.num_collumns
+
+        #if the board is the same flipped left to right, each move is worth the same
+        #as its mirror image, so only the left half (and middle) need searching
+        symmetric = board.key() == board.mirror_key()
 
-        #check if at base case
-        if depth <= 0:
-            return curr_score
-        
-        #Check if Win or Tie State is reached
-        if(curr_score > 100000):
-            return curr_score - 1
-        if(curr_score < -100000):
-            return curr_score + 1
-        if self._is_tie(board):
-            return 0
-
-        #Look through each possible spot and select best one
-        best_score = -100000000
-        for i in range(len(board)):
+        #tries out every possible move
+        best_score = None
+        for i in order:
 
-            #if collumn isn't open, don't check it
-            if not (board[i][-1] == 0):
+            #If collumn is full, don't even try it
+            if board.heights[i] == board.num_rows:
                 continue
+            if symmetric and scores[board.num_collumns - 1 - i] != None:
+                scores[i] = scores[board.num_collumns - 1 - i]
+                continue
+            change = self._play_and_score(board,i) # plays in collumn i on the imaginary board
+
+            #uses minimax to score this new board. Moves that score 2 or more below the best
+            #so far can't tie for best, so their scores only need to be that precise
+            if best_score != None:
+                alpha = max(alpha, best_score - 2)
+            scores[i] = self._minimax_with_alpha_beta_pruning(board,depth - 1,-1 * beta,-1 * alpha,-1 * (board_score + change)) * -1
+            if best_score == None or scores[i] > best_score:
+                best_score = scores[i]
+            #print("[{}]: ".format(i+1) + str(scores[i])) # <- use if you want to see what minimax scores each possible move
+
+            board.undo(i) # reset board
+
+        return scores
+
+    #same as _search_moves, but scores the moves at the same time in worker processes.
+    #Unlike _search_moves, which raises alpha to 2 below the best score it's found so
+    #far, every move here gets the full (alpha, beta) window, so none of them has to
+    #wait on another's score. Moves that can't tie for best get exact scores here
+    #instead of upper bounds, but the same collumns tie for best either way
+    def _search_moves_parallel(self, rack, board, depth, alpha, beta, deadline):
+        if self.pool == None:
+            self.pool = ProcessPoolExecutor(min(board.num_collumns, os.cpu_count()), mp_context=multiprocessing.get_context("spawn"))
+        rack = tuple(tuple(collumn) for collumn in rack) # something the workers can be sent
+        symmetric = board.key() == board.mirror_key()
+
+        futures = {}
+        for i in board.order:
+            if board.heights[i] == board.num_rows:
+                continue
+            if symmetric and board.num_collumns - 1 - i in futures:
+                continue
+            futures[i] = self.pool.submit(_search_child, rack, self.id, i, depth, alpha, beta, deadline)
 
-            #find top open spot
-            row = self._find_top_spot_open(board,i)
-            board[i][row] = id
-
-            #use minimax to get score
-            score = self._minimax(self._flip_player(id),board,depth-1) * -1
-            best_score = max(score,best_score)
-
-            board[i][row] = 0 #reset board
-        
-        #don't be mean
-        if(best_score > 100000):
-            return best_score - 1
-        if(best_score < -100000):
-            return best_score + 1
-
-        #return the Score of best position
-        return best_score
+        scores = [None] * board.num_collumns
+        for i in futures:
+            scores[i] = futures[i].result()
+            if scores[i] == None: # out of time, so the rest won't be used either
+                for future in futures.values():
+                    future.cancel()
+                return None
+            if symmetric:
+                scores[board.num_collumns - 1 - i] = scores[i]
+        return scores
 
-    def _minimax_with_alpha_beta_pruning(self,id, board,depth,alpha, beta):
+    #returns the score for the player to move, given board_score (the board's score for them),
+    #skipping moves that can't change the result
+    def _minimax_with_alpha_beta_pruning(self, board,depth,alpha, beta,board_score):
 
-        curr_score = self._eval_function(id,board)
+        curr_score = self._eval_function(board_score)
 
         #check if at base case
         if depth <= 0:
             return curr_score
+
+        #every so often, make sure there's still time to keep searching
+        if self.deadline != None:
+            self.nodes += 1
+            if self.nodes % CLOCK_CHECK_NODES == 0 and time.monotonic() > self.deadline:
+                raise _OutOfTime()
         
         #Check if Win or Tie State is reached
         if(curr_score > 100000):
@@ -117,126 +354,161 @@ class ComputerPlayer:
         if self._is_tie(board):
             return 0
 
-        #Look through each possible spot and select best one
+        #if there's a move that wins right away, nothing can beat it, so there's no need
+        #to search anything (this is the score searching would give)
+        legal = board.legal_moves()
+        if board.winning_moves(board.position, legal):
+            return 10000000 - 1 if depth <= 1 else 10000000 - 2
+
+        #if the other player could win next move, every move but blocking them loses as
+        #fast as possible, so only blocking needs searching (blocking at least ties them)
+        threats = board.winning_moves(board.position ^ board.mask, legal) if depth >= 2 else 0
+
+        #if this position (or its mirror image, which is worth the same) has been
+        #searched at least this deep already, use what we found. Both share the entry
+        #under the smaller of the two keys, with its best collumn stored that way round
+        alpha_orig = alpha
+        key = board.position + board.mask
+        mirror_key = board.mirror_position + board.mirror_mask
+        flipped = mirror_key < key
+        if flipped:
+            key = mirror_key
+        entry = self.tt.get(key)
+        if entry != None and entry[1] >= depth:
+            if entry[2] == EXACT:
+                return entry[0]
+            if entry[2] == LOWER:
+                if entry[0] > alpha:
+                    alpha = entry[0]
+            elif entry[0] < beta:
+                beta = entry[0]
+            if alpha >= beta:
+                return entry[0]
+
+        #try the best move from the last search of this position first (if there was one)
+        if threats:
+            order = (((threats & -threats).bit_length() - 1) // board.height,)
+        elif entry != None and entry[3] != None:
+            order = board.orders[board.num_collumns - 1 - entry[3] if flipped else entry[3]]
+        else:
+            order = board.order
+
+        #Look through each possible spot and select best one (with the methods
+        #looked up once, rather than for every move)
+        minimax = self._minimax_with_alpha_beta_pruning
+        play_and_score = self._play_and_score
+        undo = board.undo
+        heights = board.heights
+        num_rows = board.num_rows
         best_score = -100000000
-        for i in range(len(board)):
+        best_collumn = None
+        for i in order:
 
             #if collumn isn't open, don't check it
-            if not (board[i][-1] == 0):
+            if heights[i] == num_rows:
                 continue
 
-            #find top open spot
-            row = self._find_top_spot_open(board,i)
-            board[i][row] = id # sets the imaginary board
-
-            #runs minimax to evaluate score
-            score = self._minimax_with_alpha_beta_pruning(self._flip_player(id),board,depth-1, -1 * beta, -1 * alpha) * -1
-
-            best_score = max(score,best_score)
-
-            alpha = max(alpha,best_score) 
-            board[i][row] = 0
+            child_score = -1 * (board_score + play_and_score(board,i)) # sets the imaginary board
+
+            if best_collumn == None:
+                #runs minimax to evaluate score
+                score = minimax(board,depth-1, -1 * beta, -1 * alpha, child_score) * -1
+            else:
+                #the first move is usually the best, so for the rest, just check if they beat
+                #alpha, and only search them properly if they do. From here the window is
+                #(alpha - 2, alpha + 1): the usual (alpha, alpha + 1) with 2 extra below. A child
+                #that cuts off has its win score nudged 1 toward 0 on the way back up ("don't be
+                #mean"), and the extra room keeps that bound strictly below alpha, where it can't
+                #be mistaken for an exact score of alpha
+                score = minimax(board,depth-1, -1 * alpha - 1, -1 * alpha + 2, child_score) * -1
+                if alpha < score < beta:
+                    score = minimax(board,depth-1, -1 * beta, -1 * alpha, child_score) * -1
+
+            if score > best_score:
+                best_score = score
+                best_collumn = i
+                if score > alpha:
+                    alpha = score
+            undo(i)
 
             #doesn't check 
             if alpha >= beta: # all further nodes are guaranteed to be worse, no need to check them
                 break
+
+        #was this an exact score, or did the search stop early at one end of the window?
+        if best_score <= alpha_orig:
+            kind = UPPER
+        elif best_score >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
         
         #don't be mean
         if(best_score > 100000):
-            return best_score - 1
-        if(best_score < -100000):
-            return best_score + 1
+            best_score -= 1
+        elif(best_score < -100000):
+            best_score += 1
+
+        #remember this position. If the table is full, forget the oldest half of it all at
+        #once (deleting from the front of a dict one entry at a time gets slower and slower)
+        if flipped:
+            best_collumn = board.num_collumns - 1 - best_collumn
+        if len(self.tt) >= self.tt_size and key not in self.tt:
+            self.tt = dict(itertools.islice(self.tt.items(), self.tt_size // 2, None))
+        self.tt[key] = (best_score, depth, kind, best_collumn, board.mask.bit_count())
 
         #return the Score of best position
         return best_score
 
     
-    #evaluates and scores the board
-    def _eval_function(self,id,rack):
+    #makes a move, and returns how much it changes the board's score for the player who made it
+    #(only the sets of 4 through the new disc can change, so only those get rescored)
+    def _play_and_score(self,board,collumn):
+        own = board.position
+        opp = board.position ^ board.mask
+        change = 0
+        for w in board.windows_through[collumn * board.height + board.heights[collumn]]:
+            num_opp = (opp & w).bit_count()
+            if num_opp == 0: # the set gets better for the player moving
+                change += WINDOW_GAINS[(own & w).bit_count()]
+            elif own & w == 0: # the other player can't win with this set anymore
+                change += WINDOW_SCORES[num_opp]
+
+        board.play(collumn)
+        return change
+
+    #scores the whole board for the player to move, one set of 4 at a time
+    def _score_board(self,board):
+        own = board.position
+        opp = board.position ^ board.mask
         score = 0
-        
-        #up and down
-        for i in range(len(rack)):
-            for j in range(len(rack[i]) - 3):
-                pos = [(i,j), (i,j+1), (i,j+2), (i,j+3)]
-                score += self._score_list(id,rack,pos)
-        #sideways
-        for i in range(len(rack) - 3):
-            for j in range(len(rack[i])):
-                pos = [(i,j), (i+1,j), (i+2,j), (i+3,j)]
-                score += self._score_list(id,rack,pos)
-        #diagonal North east
-        for i in range(len(rack) - 3):
-            for j in range(len(rack[i]) - 3):
-                pos = pos = [(i,j),(i+1,j+1), (i+2,j+2), (i+3,j+3)]
-                score += self._score_list(id,rack,pos)
-
-        #diagonal North West
-        for i in range(len(rack) - 3):
-            for j in range(len(rack[i]) - 3):
-                pos = [(i,j+3),(i+1,j+2), (i+2,j+1), (i+3,j)]
-                score += self._score_list(id,rack,pos)
-        
+        for w in board.windows:
+            score += self._score_list((own & w).bit_count(),(opp & w).bit_count())
+        return score
+
+    #evaluates and scores the board, given its score for the player to move
+    def _eval_function(self,board_score):
         #if win, simplify score so further away wins are deprioritized
-        if score > 100000: 
+        if board_score > 100000: 
             return 10000000
         #if loss, simplify score so further away wins are deprioritized
-        if score < -100000:
+        if board_score < -100000:
             return -10000000
         #otherwise return score
-        return score
-
-    #scores a set of 4 spots on the board
-    def _score_list(self,id,rack,positions):
-        assert len(positions) == 4
+        return board_score
 
-        num_One = 0 # number of player 1 pieces in this set of four spots
-        num_Two = 0 # number of player 2 pieces in this set of four spots
-
-        #count number of ones and Twos
-        for pos in positions:
-            if(rack[pos[0]][pos[1]] == 1):
-                num_One += 1
-            if(rack[pos[0]][pos[1]] == 2):
-                num_Two += 1
+    #scores a set of 4 spots on the board for the player to move, given the number of
+    #their pieces (own_count) and the other player's pieces (opp_count) in it
+    def _score_list(self,own_count,opp_count):
         
-        #Check if this is a set of 4 that could still win
-        if (num_Two > 0) and (num_One > 0):
-            return 0
-        if (num_Two == 0) and (num_One == 0):
-            return 0
-
-        #Check which player has pieces in this row has more
-        num_two_higher = num_Two > num_One
-
-
-        score = max(num_One,num_Two) #
-        winning_id_is_id = (num_two_higher and (id == 2)) or ((not num_two_higher) and (id == 1))
-        
-        #gives out exponentially better scores based on how many tiles are in each board
-        if score == 1:
-            return 1 * (1 if winning_id_is_id else -1)
-        if score == 2:
-            return 10 * (1 if winning_id_is_id else -1)
-        if score == 3:
-            return 100 * (1 if winning_id_is_id else -1)
-        if score == 4:
-            return 10000000 * (1 if winning_id_is_id else -1)
+        #Check if this is a set of 4 that could still win (and for who)
+        if opp_count == 0:
+            return WINDOW_SCORES[own_count]
+        if own_count == 0:
+            return -WINDOW_SCORES[opp_count]
+        return 0
 
     #checks for a tie game
     def _is_tie(self, board):
-        for collumn in board:
-            if collumn[-1] == 0:
-                return False
-        return True
-
-    #changes the player id
-    def _flip_player(self,id):
-        return 3 - id
-    
-    #finds the top open spot in a given collumn
-    def _find_top_spot_open(self,board, collumn):
-        for i in range(len(board[collumn])):
-            if(board[collumn][i] == 0):
-                return i
-        raise Exception("Collumn Full")
+        return board.is_full()
+